@@ -132,6 +132,18 @@ DATABASES = {
 }
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/#database-caching
+# the cache must be shared between the web server's workers and management commands (e.g. `update_database`, which
+# runs as a separate process and invalidates cached API responses), so a per-process in-memory cache is unsuitable.
+# the table is created with `python manage.py createcachetable`.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
@@ -186,6 +198,12 @@ ELASTICSEARCH_DSL = {
 
 ELASTICSEARCH_DSL_AUTOSYNC = False
 
+# the `cards` index is small (well under 1 GB for most deployments), so a single shard avoids fanning every query out
+# across several shards and merging the results. as a rule of thumb, use 1 shard if the index is under 1 GB,
+# otherwise ceil(number of cards / 5,000,000). changing these requires the index to be rebuilt.
+ES_INDEX_SHARDS = env.int("ES_INDEX_SHARDS", default=1)
+ES_INDEX_REPLICAS = env.int("ES_INDEX_REPLICAS", default=0)
+
 # Email for logging
 ADMINS = [("admin", env("TARGET_EMAIL", default=""))]
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
@@ -1,5 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class CardpickerConfig(AppConfig):
     name = "cardpicker"
+
+    def ready(self) -> None:
+        from cardpicker.caching import invalidate_cached_responses
+        from cardpicker.models import Source, Tag
+
+        # some API responses are cached until the models they're built from are modified.
+        # cards and DFC pairs are only written in bulk by management commands, which invalidate the cache once
+        # themselves - connecting them here would run a cache query for every row deleted by those commands.
+        for model in [Source, Tag]:
+            post_save.connect(invalidate_cached_responses, sender=model)
+            post_delete.connect(invalidate_cached_responses, sender=model)
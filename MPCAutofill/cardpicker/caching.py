@@ -0,0 +1,125 @@
+"""
+Caching for API responses which only change when the database is modified.
+"""
+
+import datetime as dt
+import uuid
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Optional, TypeVar, cast
+
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+F = TypeVar("F", bound=Callable[..., HttpResponse])
+
+# cache keys for view responses
+SOURCES_CACHE_KEY = "view:get_sources"
+DFC_PAIRS_CACHE_KEY = "view:get_dfc_pairs"
+LANGUAGES_CACHE_KEY = "view:get_languages"
+TAGS_CACHE_KEY = "view:get_tags"
+INFO_CACHE_KEY = "view:get_info"
+# identifies the cached paginator counts which are still valid - a new version is issued whenever the database changes
+PAGINATOR_COUNT_VERSION_CACHE_KEY = "paginator:count:version"
+
+# responses built purely from the database are invalidated when the database changes, so they can be cached for a while
+DATABASE_CACHE_TIMEOUT = 60 * 60
+# the Patreon member count can change at any time, so responses including it are only cached briefly
+PATREON_CACHE_TIMEOUT = 60
+# object counts for paginated querysets
+PAGINATOR_COUNT_CACHE_TIMEOUT = 5 * 60
+
+
+def invalidate_cached_responses(**kwargs: Any) -> None:
+    """
+    Drop all cached responses which are built from the database.
+    The signature allows this function to be connected to model signals.
+    """
+
+    cache.delete_many(
+        [SOURCES_CACHE_KEY, DFC_PAIRS_CACHE_KEY, LANGUAGES_CACHE_KEY, TAGS_CACHE_KEY, PAGINATOR_COUNT_VERSION_CACHE_KEY]
+    )
+
+
+def get_paginator_count_version() -> str:
+    """
+    Return an opaque identifier to include in the cache keys of paginator counts, so that all cached counts are
+    dropped by `invalidate_cached_responses` without having to know their keys.
+    """
+
+    return cache.get_or_set(PAGINATOR_COUNT_VERSION_CACHE_KEY, lambda: uuid.uuid4().hex, timeout=None)
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """
+    A response body stored together with the validators which identify it, so the two can't go out of sync.
+    """
+
+    content: bytes
+    content_type: str
+    etag: str
+    last_modified: dt.datetime
+
+    def apply_validators(self, response: HttpResponse) -> HttpResponse:
+        response["ETag"] = quote_etag(self.etag)
+        response["Last-Modified"] = http_date(self.last_modified.timestamp())
+        return response
+
+
+def cached_database_response(cache_key: str) -> Callable[[F], F]:
+    """
+    Decorator for GET views whose responses are built purely from the database.
+    Successful responses are cached under `cache_key` (which is dropped by `invalidate_cached_responses`) along with
+    their ETag and Last-Modified validators, and conditional requests matching those validators are answered with
+    304 Not Modified without calling the view.
+    """
+
+    def decorator(func: F) -> F:
+        @wraps(func)
+        def wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+            cached_response: Optional[CachedResponse] = cache.get(cache_key)
+            if cached_response is None:
+                response = func(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                cached_response = CachedResponse(
+                    content=response.content,
+                    content_type=response["Content-Type"],
+                    etag=uuid.uuid4().hex,
+                    last_modified=timezone.now(),
+                )
+                cache.set(cache_key, cached_response, timeout=DATABASE_CACHE_TIMEOUT)
+
+            response = get_conditional_response(
+                request,
+                etag=quote_etag(cached_response.etag),
+                last_modified=int(cached_response.last_modified.timestamp()),
+            )
+            if response is None:
+                response = HttpResponse(content=cached_response.content, content_type=cached_response.content_type)
+            return cached_response.apply_validators(response)
+
+        return cast(F, wrapper)
+
+    return decorator
+
+
+__all__ = [
+    "SOURCES_CACHE_KEY",
+    "DFC_PAIRS_CACHE_KEY",
+    "LANGUAGES_CACHE_KEY",
+    "TAGS_CACHE_KEY",
+    "INFO_CACHE_KEY",
+    "PAGINATOR_COUNT_VERSION_CACHE_KEY",
+    "DATABASE_CACHE_TIMEOUT",
+    "PATREON_CACHE_TIMEOUT",
+    "PAGINATOR_COUNT_CACHE_TIMEOUT",
+    "invalidate_cached_responses",
+    "get_paginator_count_version",
+    "CachedResponse",
+    "cached_database_response",
+]
@@ -2,11 +2,17 @@ import pycountry
 
 DATE_FORMAT = "jS F, Y"
 DEFAULT_LANGUAGE = pycountry.languages.get(alpha_2="EN")
+# upper-case ISO 639-1 code -> language name, built once because `pycountry.languages.get` scans every language
+LANGUAGE_NAMES = {
+    language.alpha_2.upper(): language.name for language in pycountry.languages if hasattr(language, "alpha_2")
+}
 PAGE_SIZE = 10
 
 NEW_CARDS_PAGE_SIZE = 12
 NEW_CARDS_DAYS = 14
 SEARCH_RESULTS_PAGE_SIZE = 300
+# the number of hits requested per query in a multi-search. elasticsearch's `index.max_result_window` defaults to this.
+MULTI_SEARCH_MAX_HITS = 10000
 CARDS_PAGE_SIZE = 1000
 
 MAX_SIZE_MB = 30
@@ -2,6 +2,7 @@ import time
 
 from bulk_sync import bulk_sync
 
+from cardpicker.caching import invalidate_cached_responses
 from cardpicker.integrations.integrations import get_configured_game_integration
 from cardpicker.models import DFCPair
 
@@ -16,4 +17,5 @@ def sync_dfcs() -> None:
     dfc_pairs = game_integration.get_dfc_pairs()
     key_fields = ("front",)
     bulk_sync(new_models=dfc_pairs, key_fields=key_fields, filters=None, db_class=DFCPair)
+    invalidate_cached_responses()  # DFC pairs have no signal receivers to do this (see `CardpickerConfig.ready`)
     print(f"Finished importing DFC pairs - this task took {(time.time() - t0):.2f} seconds.")
@@ -4,6 +4,7 @@ from django_elasticsearch_dsl import Document, fields
 from django_elasticsearch_dsl.registries import registry
 from elasticsearch_dsl import analyzer
 
+from django.conf import settings as django_settings
 from django.utils import dateformat
 
 from cardpicker.constants import DATE_FORMAT
@@ -12,6 +13,9 @@ from cardpicker.models import Card
 # custom elasticsearch analysers are configured here to add the `asciifolding` filter, which handles accents:
 # https://www.elastic.co/guide/en/elasticsearch/reference/7.17/analysis-asciifolding-tokenfilter.html
 # https://www.elastic.co/guide/en/elasticsearch/reference/current/analysis-standard-analyzer.html
+# note that fuzzy searches match the individual words produced by `fuzzy_analyser` with a plain `match` query, and
+# results are ranked by edit distance afterwards - avoid adding a shingle filter here, as that would multiply the number
+# of terms indexed and matched per card name.
 precise_analyser = analyzer("precise_analyser", tokenizer="keyword", filter=["apostrophe", "lowercase", "asciifolding"])
 fuzzy_analyser = analyzer("fuzzy_analyser", tokenizer="standard", filter=["apostrophe", "lowercase", "asciifolding"])
 
@@ -34,7 +38,11 @@ fuzzy_analyser = analyzer("fuzzy_analyser", tokenizer="standard", filter=["apost
 #         # name of the elasticsearch index
 #         name = "cards"
 #         # see Elasticsearch Indices API reference for available settings
-#         settings = {"number_of_shards": 5, "number_of_replicas": 0}
+#         settings = {
+#             "number_of_shards": django_settings.ES_INDEX_SHARDS,
+#             "number_of_replicas": django_settings.ES_INDEX_REPLICAS,
+#             "refresh_interval": "30s",
+#         }
 #
 #     class Django:
 #         model = Card
@@ -64,7 +72,13 @@ class CardSearch(Document):
         # name of the elasticsearch index
         name = "cards"
         # see Elasticsearch Indices API reference for available settings
-        settings = {"number_of_shards": 5, "number_of_replicas": 0}
+        # cards are indexed in bulk by `update_database` rather than streamed in, so refreshing infrequently
+        # reduces segment churn while the index is being rebuilt
+        settings = {
+            "number_of_shards": django_settings.ES_INDEX_SHARDS,
+            "number_of_replicas": django_settings.ES_INDEX_REPLICAS,
+            "refresh_interval": "30s",
+        }
 
     class Django:
         model = Card
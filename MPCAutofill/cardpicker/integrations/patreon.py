@@ -11,6 +11,10 @@ patreon_header = {
     "User-Agent": f"Patreon-Python, version 0.5.1, platform {platform.platform()}",
 }
 
+# a shared session keeps connections to the Patreon API alive between requests, saving a TCP + TLS handshake per call
+patreon_session = requests.Session()
+patreon_session.headers.update(patreon_header)
+
 
 class Campaign(TypedDict):
     # Campaign data scheme
@@ -42,7 +46,7 @@ def get_patreon_campaign_details() -> tuple[Optional[Campaign], Optional[dict[st
         return None, None
 
     try:
-        res = requests.get(
+        res = patreon_session.get(
             # https://docs.patreon.com/#get-api-oauth2-v2-campaigns
             url="https://www.patreon.com/api/oauth2/v2/campaigns",
             params={
@@ -50,7 +54,6 @@ def get_patreon_campaign_details() -> tuple[Optional[Campaign], Optional[dict[st
                 "fields[campaign]": "summary",
                 "fields[tier]": ",".join(["title", "description", "amount_cents"]),
             },
-            headers=patreon_header,
         ).json()
 
         # Properly format campaign details
@@ -81,7 +84,7 @@ def get_patrons(campaign_id: str, campaign_tiers: dict[str, SupporterTier]) -> O
         return None
 
     try:
-        members = requests.get(
+        members = patreon_session.get(
             # https://docs.patreon.com/#get-api-oauth2-v2-campaigns-campaign_id-members
             url=f"https://www.patreon.com/api/oauth2/v2/campaigns/{campaign_id}/members",
             params={
@@ -90,7 +93,6 @@ def get_patrons(campaign_id: str, campaign_tiers: dict[str, SupporterTier]) -> O
                     ["full_name", "campaign_lifetime_support_cents", "pledge_relationship_start", "patron_status"]
                 ),
             },
-            headers=patreon_header,
         ).json()["data"]
 
         # Return formatted list of patrons
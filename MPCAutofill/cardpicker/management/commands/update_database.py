@@ -17,7 +17,7 @@ class Command(BaseCommand):
         parser.add_argument("-d", "--drive", type=str, help="Only update a specific drive")
 
     def handle(self, *args: Any, **kwargs: str) -> None:
-        if not ping_elasticsearch():
+        if not ping_elasticsearch(force=True):
             raise Exception("Elasticsearch is offline!")
         # user can specify which drive should be searched - if no drive is specified, search all drives
         drive: Optional[str] = kwargs.get("drive", None)
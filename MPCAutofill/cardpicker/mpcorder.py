@@ -250,7 +250,10 @@ class MPCOrder(abc.MutableMapping[str, Any]):
     def from_text(self, input_lines: str, offset: int = 0) -> int:
         # TODO: update naming for clarity, add docstring, etc.
         # populates MPCOrder from supplied text input
-        transforms = dict((to_searchable(x.front), to_searchable(x.back)) for x in DFCPair.objects.all())
+        transforms = {
+            to_searchable(front): to_searchable(back) for front, back in DFCPair.objects.values_list("front", "back")
+        }
+        transform_backs = set(transforms.values())  # membership tests on `dict.values()` are linear
         curr_slot = offset
 
         # loop over lines in the input text, and for each, parse it into usable information
@@ -272,7 +275,7 @@ class MPCOrder(abc.MutableMapping[str, Any]):
                 query_faces = [query, ""]
                 query_split = [to_searchable(x) for x in query.split(" & ")]
                 if len(query_split) > 1:
-                    if query_split[0] in transforms.keys() and query_split[1] in transforms.values():
+                    if query_split[0] in transforms and query_split[1] in transform_backs:
                         query_faces = query_split
                 elif query[0:2].lower() == "t:":
                     query_faces[0] = to_searchable(query[2:])
@@ -280,7 +283,7 @@ class MPCOrder(abc.MutableMapping[str, Any]):
                 else:
                     query_faces[0] = to_searchable(query)
                     # gotta check if query is the front of a DFC here as well
-                    if query_faces[0] in transforms.keys():
+                    if query_faces[0] in transforms:
                         query_faces = [query_faces[0], transforms[query_faces[0]]]
 
                 # stick the front face into the dictionary
@@ -305,7 +308,10 @@ class MPCOrder(abc.MutableMapping[str, Any]):
     def from_csv(self, csv_bytes: bytes) -> int:
         # TODO: as above, these return integer length of the cards added to the order (I think)
         # populates MPCOrder from supplied CSV bytes
-        transforms = dict((to_searchable(x.front), to_searchable(x.back)) for x in DFCPair.objects.all())
+        transforms = {
+            to_searchable(front): to_searchable(back) for front, back in DFCPair.objects.values_list("front", "back")
+        }
+        transform_backs = set(transforms.values())  # membership tests on `dict.values()` are linear
         # TODO: I'm sure this can be cleaned up a lot, the logic here is confusing and unintuitive
         curr_slot = 0
 
@@ -354,12 +360,12 @@ class MPCOrder(abc.MutableMapping[str, Any]):
                     # first, determine if this card is a DFC by virtue of it having its two faces separated by an &
                     query_split = [to_searchable(x) for x in query_faces[0].split(" & ")]
                     if len(query_split) > 1:
-                        if query_split[0] in transforms.keys() and query_split[1] in transforms.values():
+                        if query_split[0] in transforms and query_split[1] in transform_backs:
                             query_faces = query_split
                     else:
                         # gotta check if query is the front of a DFC here as well
                         query_faces[0] = to_searchable(query_faces[0])
-                        if query_faces[0] in transforms.keys():
+                        if query_faces[0] in transforms:
                             query_faces = [query_faces[0], transforms[query_faces[0]]]
 
                 else:
@@ -1,9 +1,12 @@
 import datetime as dt
 import json
+import math
 import threading
+import time
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Callable, Optional, TypeVar, cast
+from typing import Any, Callable, Iterable, Optional, TypeVar, cast
 
 import pycountry
 from elasticsearch import Elasticsearch
@@ -11,17 +14,22 @@ from elasticsearch.exceptions import ConnectionError as ElasticConnectionError
 from elasticsearch_dsl.document import Search
 from elasticsearch_dsl.index import Index
 from elasticsearch_dsl.query import Bool, Match, Range, Term, Terms
+from elasticsearch_dsl.search import MultiSearch
 from jsonschema import Draft201909Validator
 from Levenshtein import distance
 from referencing import Registry, Resource
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.paginator import Paginator
-from django.db.models import Q, QuerySet
+from django.db.models import Count, Q, QuerySet
 from django.http import HttpRequest
 from django.utils import timezone
+from django.utils.functional import cached_property
 
+from cardpicker.caching import PAGINATOR_COUNT_CACHE_TIMEOUT, get_paginator_count_version
 from cardpicker.constants import (
+    MULTI_SEARCH_MAX_HITS,
     NEW_CARDS_DAYS,
     NEW_CARDS_PAGE_SIZE,
     SEARCH_RESULTS_PAGE_SIZE,
@@ -32,6 +40,11 @@ from cardpicker.search.sanitisation import to_searchable
 
 thread_local = threading.local()  # Should only be called once per thread
 
+# the result of pinging elasticsearch is reused for this many seconds
+PING_CACHE_TTL = 2
+ping_lock = threading.Lock()
+last_ping: Optional[tuple[float, bool]] = None  # (time.monotonic() of the ping, whether elasticsearch responded)
+
 # https://mypy.readthedocs.io/en/stable/generics.html#declaring-decorators
 F = TypeVar("F", bound=Callable[..., Any])
 
@@ -59,11 +72,24 @@ class SearchExceptions:
 def get_elasticsearch_connection() -> Elasticsearch:
     if (es := getattr(thread_local, "elasticsearch", None)) is None:
         es = Elasticsearch([settings.ELASTICSEARCH_HOST], port=9200)
+        thread_local.elasticsearch = es
     return es
 
 
-def ping_elasticsearch() -> bool:
-    return get_elasticsearch_connection().ping()
+def ping_elasticsearch(force: bool = False) -> bool:
+    """
+    Check whether elasticsearch is reachable. The result is shared within this process for `PING_CACHE_TTL` seconds
+    so busy endpoints don't make a round-trip to elasticsearch on every request - specify `force` to always ping.
+    """
+
+    global last_ping
+    with ping_lock:
+        if not force and last_ping is not None and time.monotonic() - last_ping[0] < PING_CACHE_TTL:
+            return last_ping[1]
+    online = get_elasticsearch_connection().ping()
+    with ping_lock:
+        last_ping = (time.monotonic(), online)
+    return online
 
 
 def elastic_connection(func: F) -> F:
@@ -338,15 +364,11 @@ class SearchQuery:
                     queries.add(query)
         return sorted(queries, key=lambda x: (x.query, x.card_type))
 
-    @elastic_connection
-    def retrieve_card_identifiers(self, search_settings: SearchSettings) -> list[str]:
+    def build_search(self, search_settings: SearchSettings) -> Search:
         """
-        This is the core search function for MPC Autofill - queries Elasticsearch for `self` given `search_settings`
-        and returns the list of corresponding `Card` identifiers.
+        Build the Elasticsearch search for `self` given `search_settings`.
         """
 
-        if not Index(CardSearch.Index.name).exists():
-            raise SearchExceptions.IndexNotFoundException(CardSearch.__name__)
         query_parsed = to_searchable(self.query)
 
         # set up search - match the query and use the AND operator
@@ -376,24 +398,75 @@ class SearchQuery:
             s = s.filter(Bool(should=Terms(tags=search_settings.includes_tags), minimum_should_match=1))
         if search_settings.excludes_tags:
             s = s.filter(Bool(must_not=Terms(tags=search_settings.excludes_tags)))
-        hits_iterable = s.params(preserve_order=True).scan()
+        return s
+
+    def sort_hits(self, hits_iterable: Iterable[Any], search_settings: SearchSettings) -> list[str]:
+        """
+        Order the hits returned by Elasticsearch for `self` according to `search_settings` and return the
+        corresponding `Card` identifiers.
+        """
 
         source_order = search_settings.get_source_order()
         if search_settings.fuzzy_search:
+            query_parsed = to_searchable(self.query)
             hits = sorted(hits_iterable, key=lambda x: (source_order[x.source], distance(x.searchq, query_parsed)))
         else:
             hits = sorted(hits_iterable, key=lambda x: source_order[x.source])
 
         return [x.identifier for x in hits]
 
+    @elastic_connection
+    def retrieve_card_identifiers(self, search_settings: SearchSettings) -> list[str]:
+        """
+        This is the core search function for MPC Autofill - queries Elasticsearch for `self` given `search_settings`
+        and returns the list of corresponding `Card` identifiers.
+        """
+
+        if not Index(CardSearch.Index.name).exists():
+            raise SearchExceptions.IndexNotFoundException(CardSearch.__name__)
+        hits_iterable = self.build_search(search_settings).params(preserve_order=True).scan()
+        return self.sort_hits(hits_iterable, search_settings)
+
+
+@elastic_connection
+def retrieve_card_identifiers_for_queries(
+    queries: list[SearchQuery], search_settings: SearchSettings
+) -> dict[SearchQuery, list[str]]:
+    """
+    Equivalent to calling `SearchQuery.retrieve_card_identifiers` for each unique query in `queries`, but all queries
+    are sent to Elasticsearch in a single multi-search request.
+    In the rare event that a query has more hits than a single search can return, that query's hits are scrolled
+    through separately.
+    """
+
+    unique_queries = list(dict.fromkeys(queries))
+    if not unique_queries:
+        return {}
+    if not Index(CardSearch.Index.name).exists():
+        raise SearchExceptions.IndexNotFoundException(CardSearch.__name__)
+
+    multi_search = MultiSearch(index=CardSearch.Index.name)
+    for query in unique_queries:
+        multi_search = multi_search.add(query.build_search(search_settings).extra(size=MULTI_SEARCH_MAX_HITS))
+    responses = multi_search.execute()
+
+    results: dict[SearchQuery, list[str]] = {}
+    for query, response in zip(unique_queries, responses):
+        if len(response.hits) < MULTI_SEARCH_MAX_HITS:
+            results[query] = query.sort_hits(response.hits, search_settings)
+        else:
+            results[query] = query.retrieve_card_identifiers(search_settings=search_settings)
+    return results
+
 
 def get_schema_directory() -> Path:
     return Path(__file__).parent.parent.parent.parent / "common" / "schemas"
 
 
-def parse_json_body_as_search_settings(json_body: dict[str, Any]) -> SearchSettings:
+@lru_cache(maxsize=None)
+def get_search_settings_validator() -> Draft201909Validator:
     """
-    :raises: ValidationError
+    Build the validator for search settings JSON bodies. Memoised so the schemas are only read and compiled once.
     """
 
     schema_directory = get_schema_directory()
@@ -418,16 +491,25 @@ def parse_json_body_as_search_settings(json_body: dict[str, Any]) -> SearchSetti
         },
         registry=registry,  # type: ignore  # apparently this is an unexpected keyword argument
     )
+    return schema_validator
+
+
+def parse_json_body_as_search_settings(json_body: dict[str, Any]) -> SearchSettings:
+    """
+    :raises: ValidationError
+    """
 
     # the below line may raise ValidationError
-    schema_validator.validate(json_body)
+    get_search_settings_validator().validate(json_body)
 
     return SearchSettings.from_json_body(json_body)
 
 
-def parse_json_body_as_search_data(json_body: dict[str, Any]) -> tuple[SearchSettings, list[SearchQuery]]:
+@lru_cache(maxsize=None)
+def get_search_data_validator(max_queries: int) -> Draft201909Validator:
     """
-    :raises: ValidationError
+    Build the validator for search data JSON bodies with at most `max_queries` queries.
+    Memoised so the schemas are only read and compiled once.
     """
 
     schema_directory = get_schema_directory()
@@ -445,7 +527,7 @@ def parse_json_body_as_search_data(json_body: dict[str, Any]) -> tuple[SearchSet
                         "$id": "search_queries.json",
                         "type": "array",
                         "items": [{"$ref": "search_query.json"}],
-                        "maxItems": SEARCH_RESULTS_PAGE_SIZE,
+                        "maxItems": max_queries,
                     }
                 ),
             )
@@ -465,25 +547,79 @@ def parse_json_body_as_search_data(json_body: dict[str, Any]) -> tuple[SearchSet
         },
         registry=registry,  # type: ignore  # apparently this is an unexpected keyword argument
     )
+    return schema_validator
+
+
+def parse_json_body_as_search_data(json_body: dict[str, Any]) -> tuple[SearchSettings, list[SearchQuery]]:
+    """
+    :raises: ValidationError
+    """
 
     # the below line may raise ValidationError
-    schema_validator.validate(json_body)
+    get_search_data_validator(SEARCH_RESULTS_PAGE_SIZE).validate(json_body)
 
     return SearchSettings.from_json_body(json_body), SearchQuery.list_from_json_body(json_body)
 
 
-def get_new_cards_paginator(source: Source) -> Paginator[QuerySet[Card]]:
+class CachingPaginator(Paginator[QuerySet[Card]]):
+    """
+    Paginator which caches the number of objects in its queryset under `cache_key` so that paginating over the same
+    queryset in multiple requests doesn't run `COUNT(*)` each time.
+    """
+
+    def __init__(self, object_list: QuerySet[Card], per_page: int, *, cache_key: str, **kwargs: Any) -> None:
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = cache_key
+
+    @cached_property
+    def count(self) -> int:
+        return cache.get_or_set(self.cache_key, lambda: self.object_list.count(), timeout=PAGINATOR_COUNT_CACHE_TIMEOUT)
+
+
+def get_new_cards_queryset() -> QuerySet[Card]:
     now = timezone.now()
-    cards = Card.objects.filter(
-        source=source, date__lt=now, date__gte=now - dt.timedelta(days=NEW_CARDS_DAYS)
-    ).order_by("-date")
-    return Paginator(cards, NEW_CARDS_PAGE_SIZE)  # type: ignore  # TODO: `_SupportsPagination`
+    return (
+        Card.objects.filter(date__lt=now, date__gte=now - dt.timedelta(days=NEW_CARDS_DAYS))
+        .select_related("source")
+        .order_by("-date")
+    )
+
+
+def get_new_cards_paginator(source: Source) -> Paginator[QuerySet[Card]]:
+    cards = get_new_cards_queryset().filter(source=source)
+    # the queryset's time window moves with every request, so the count is keyed on the source and day instead.
+    # the version ensures the count agrees with `retrieve_new_cards_first_pages` once the database has been updated
+    key = f"paginator:count:new_cards:{get_paginator_count_version()}:{source.pk}:{timezone.localdate().isoformat()}"
+    return CachingPaginator(cards, NEW_CARDS_PAGE_SIZE, cache_key=key)  # type: ignore  # TODO: `_SupportsPagination`
+
+
+def retrieve_new_cards_first_pages() -> dict[str, dict[str, Any]]:
+    """
+    Retrieve the first page of new cards for each source which has new cards, keyed by source key.
+    The number of new cards per source is counted in a single query rather than once per source.
+    """
+
+    cards = get_new_cards_queryset()
+    hits_by_source_pk: dict[int, int] = dict(
+        cards.order_by().values("source_id").annotate(hits=Count("id")).values_list("source_id", "hits")
+    )
+    sources = list(Source.objects.filter(pk__in=list(hits_by_source_pk.keys())))
+    return {
+        source.key: {
+            "source": source.to_dict(),
+            "hits": hits_by_source_pk[source.pk],
+            "pages": math.ceil(hits_by_source_pk[source.pk] / NEW_CARDS_PAGE_SIZE),
+            "cards": [card.to_dict() for card in cards.filter(source=source)[:NEW_CARDS_PAGE_SIZE]],
+        }
+        for source in sources
+    }
 
 
 # endregion
 
 __all__ = [
     "SearchExceptions",
+    "PING_CACHE_TTL",
     "get_elasticsearch_connection",
     "ping_elasticsearch",
     "elastic_connection",
@@ -497,8 +633,14 @@ __all__ = [
     "search_new",
     "SearchSettings",
     "SearchQuery",
+    "retrieve_card_identifiers_for_queries",
     "get_schema_directory",
+    "get_search_settings_validator",
     "parse_json_body_as_search_settings",
+    "get_search_data_validator",
     "parse_json_body_as_search_data",
+    "CachingPaginator",
+    "get_new_cards_queryset",
     "get_new_cards_paginator",
+    "retrieve_new_cards_first_pages",
 ]
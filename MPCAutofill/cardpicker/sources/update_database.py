@@ -7,6 +7,7 @@ from typing import Optional, Type
 from django.conf import settings
 from django.db import transaction
 
+from cardpicker.caching import invalidate_cached_responses
 from cardpicker.constants import DEFAULT_LANGUAGE, MAX_SIZE_MB
 from cardpicker.models import Card, CardTypes, Source
 from cardpicker.search.sanitisation import to_searchable
@@ -131,6 +132,7 @@ def bulk_sync_objects(source: Source, cards: list[Card]) -> None:
     with transaction.atomic():  # django-bulk-sync is crushingly slow with postgres
         Card.objects.filter(source=source).delete()
         Card.objects.bulk_create(cards)
+    invalidate_cached_responses()  # cards have no signal receivers to do this (see `CardpickerConfig.ready`)
     print(f" and done! That took {TEXT_BOLD}{(time.time() - t0):.2f}{TEXT_END} seconds.")
 
 
@@ -4,7 +4,9 @@ from typing import Type
 import pytest
 from pytest_elasticsearch import factories
 
+from django.core.cache import cache
 from django.core.management import call_command
+from django.test import override_settings
 
 from cardpicker.integrations.base import GameIntegration
 from cardpicker.models import Card, CardTypes, DFCPair, Source, Tag
@@ -24,6 +26,19 @@ def django_settings(db, settings):
     settings.DEFAULT_CARDBACK_IMAGE_NAME = Cards.SIMPLE_CUBE.value.name
 
 
+@pytest.fixture(scope="session", autouse=True)
+def local_memory_cache():
+    # the database cache used in production can't be touched by tests which don't have database access
+    with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(local_memory_cache):
+    # cached API responses would otherwise leak between tests
+    cache.clear()
+
+
 @pytest.fixture()
 def integration_setter(settings, monkeypatch):
     # this uses a neat lil trick i picked up at work for creating "parametrised fixtures"
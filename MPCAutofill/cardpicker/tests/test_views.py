@@ -10,7 +10,9 @@ from syrupy import SnapshotAssertion
 from django.urls import reverse
 
 from cardpicker import views
+from cardpicker.sources.update_database import bulk_sync_objects
 from cardpicker.tests.constants import Cards, DummyImportSite, Sources
+from cardpicker.tests.factories import CardFactory
 
 
 def snapshot_response(response: Response, snapshot: SnapshotAssertion):
@@ -131,6 +133,26 @@ class TestPostSearchResults:
             Cards.PAST_IN_FLAMES_2.value.identifier,
         ]
 
+    def test_search_for_card_with_more_hits_than_multi_search_returns(self, client, monkeypatch):
+        monkeypatch.setattr("cardpicker.search.search_functions.MULTI_SEARCH_MAX_HITS", 1)
+        response = client.post(
+            reverse(views.post_search_results),
+            {
+                "searchSettings": BASE_SEARCH_SETTINGS,
+                "queries": [
+                    {"query": Cards.PAST_IN_FLAMES_1.value.name, "card_type": "CARD"},
+                    {"query": Cards.BRAINSTORM.value.name, "card_type": "CARD"},
+                ],
+            },
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+        assert response.json()["results"][Cards.PAST_IN_FLAMES_1.value.name]["CARD"] == [
+            Cards.PAST_IN_FLAMES_1.value.identifier,
+            Cards.PAST_IN_FLAMES_2.value.identifier,
+        ]
+        assert response.json()["results"][Cards.BRAINSTORM.value.name]["CARD"] == [Cards.BRAINSTORM.value.identifier]
+
     def test_search_for_card_with_versions_from_two_sources_under_reversed_search_order(self, client, snapshot):
         search_settings = deepcopy(BASE_SEARCH_SETTINGS)
         search_settings["sourceSettings"]["sources"] = [
@@ -541,6 +563,21 @@ class TestGetSources:
         response = client.get(reverse(views.get_sources))
         snapshot_response(response, snapshot)
 
+    def test_conditional_get_request(self, client, all_sources):
+        response = client.get(reverse(views.get_sources))
+        assert response.status_code == 200
+        response = client.get(reverse(views.get_sources), HTTP_IF_NONE_MATCH=response["ETag"])
+        assert response.status_code == 304
+
+    def test_conditional_get_request_after_source_modified(self, client, all_sources, example_drive_1):
+        response = client.get(reverse(views.get_sources))
+        example_drive_1.description = "Modified description"
+        example_drive_1.save()
+        modified_response = client.get(reverse(views.get_sources), HTTP_IF_NONE_MATCH=response["ETag"])
+        assert modified_response.status_code == 200
+        assert modified_response["ETag"] != response["ETag"]
+        assert modified_response.json()["results"][str(example_drive_1.pk)]["description"] == "Modified description"
+
     def test_post_request(self, client, django_settings, snapshot):
         response = client.post(reverse(views.get_sources))
         snapshot_response(response, snapshot)
@@ -571,6 +608,13 @@ class TestGetLanguages:
         response = client.get(reverse(views.get_languages))
         assert response.json()["languages"] == [{"name": "English", "code": "EN"}, {"name": "French", "code": "FR"}]
 
+    def test_cached_languages_invalidated_by_card_sync(self, client, django_settings, island):
+        response = client.get(reverse(views.get_languages))
+        assert response.json()["languages"] == [{"name": "English", "code": "EN"}]
+        bulk_sync_objects(source=island.source, cards=[CardFactory.build(source=island.source, language="FR")])
+        response = client.get(reverse(views.get_languages))
+        assert response.json()["languages"] == [{"name": "French", "code": "FR"}]
+
     def test_post_request(self, client, django_settings, snapshot):
         response = client.post(reverse(views.get_languages))
         snapshot_response(response, snapshot)
@@ -934,6 +978,30 @@ class TestGetSampleCards:
         assert len(json_body["cards"]["CARD"]) == 4
         assert len(json_body["cards"]["TOKEN"]) == 0
 
+    def test_cards_grouped_by_type_when_created_out_of_order(
+        self,
+        client,
+        django_settings,
+        elasticsearch,
+        all_sources,
+        # card types are deliberately interleaved in primary key order
+        brainstorm,
+        goblin,
+        island,
+        simple_cube,
+        island_classical,
+    ):
+        response = client.get(reverse(views.get_sample_cards))
+        assert response.status_code == 200
+        json_body = response.json()
+        assert {card_type: len(cards) for card_type, cards in json_body["cards"].items()} == {
+            "CARD": 3,
+            "CARDBACK": 1,
+            "TOKEN": 1,
+        }
+        for card_type, cards in json_body["cards"].items():
+            assert all(card["card_type"] == card_type for card in cards)
+
     def test_post_request(self, client, django_settings, snapshot):
         response = client.post(reverse(views.get_sample_cards))
         snapshot_response(response, snapshot)
@@ -1060,6 +1128,15 @@ class TestNewCardsPage:
         snapshot_response(response, snapshot)
         assert response.status_code == 200
 
+    @freezegun.freeze_time(dt.datetime(2023, 1, 2))
+    def test_cached_count_invalidated_by_card_sync(self, client, example_drive_2):
+        params = {"source": Sources.EXAMPLE_DRIVE_2.value.key, "page": 2}
+        assert client.get(reverse(views.get_new_cards_page), params).status_code == 400
+        bulk_sync_objects(source=example_drive_2, cards=CardFactory.build_batch(7, source=example_drive_2))
+        response = client.get(reverse(views.get_new_cards_page), params)
+        assert response.status_code == 200
+        assert len(response.json()["cards"]) == 1
+
     @freezegun.freeze_time(dt.datetime(2024, 1, 2))
     def test_no_data_in_date_range(self, client, snapshot):
         response = client.get(
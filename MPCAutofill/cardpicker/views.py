@@ -1,23 +1,35 @@
 import datetime as dt
-import itertools
 import json
 from collections import defaultdict
-from random import sample
+from functools import lru_cache, wraps
+from operator import itemgetter
 from typing import Any, Callable, Optional, TypeVar, Union, cast
 
-import pycountry
+import orjson
 import sentry_sdk
 from blog.models import BlogPost
-from jsonschema import ValidationError, validate
+from jsonschema import Draft202012Validator, ValidationError
+from jsonschema.exceptions import best_match
 
 from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db.models import Q
 from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import redirect, render
 from django.utils import timezone
-from django.views.decorators.csrf import csrf_exempt
-
-from cardpicker.constants import CARDS_PAGE_SIZE, DEFAULT_LANGUAGE, NSFW
+from django.views.decorators.cache import cache_control
+
+from cardpicker.caching import (
+    DFC_PAIRS_CACHE_KEY,
+    INFO_CACHE_KEY,
+    LANGUAGES_CACHE_KEY,
+    PATREON_CACHE_TIMEOUT,
+    SOURCES_CACHE_KEY,
+    TAGS_CACHE_KEY,
+    cached_database_response,
+)
+from cardpicker.constants import CARDS_PAGE_SIZE, DEFAULT_LANGUAGE, LANGUAGE_NAMES, NSFW
 from cardpicker.forms import InputCSV, InputLink, InputText, InputXML
 from cardpicker.integrations.integrations import get_configured_game_integration
 from cardpicker.integrations.patreon import get_patreon_campaign_details, get_patrons
@@ -34,6 +46,8 @@ from cardpicker.search.search_functions import (
     query_es_card,
     query_es_cardback,
     query_es_token,
+    retrieve_card_identifiers_for_queries,
+    retrieve_new_cards_first_pages,
     retrieve_search_settings,
     search_new,
     search_new_elasticsearch_definition,
@@ -414,32 +428,105 @@ class BadRequestException(Exception):
     pass
 
 
-class NewErrorWrappers:
+json_encoder = DjangoJSONEncoder()
+
+
+def dump_json(data: Any) -> bytes:
     """
-    View function decorators which gracefully handle exceptions and allow the exception message to be displayed
-    to the user.
+    Serialise `data` to JSON with `orjson`, which is much faster than the stdlib encoder used by `JsonResponse`.
+    Non-string keys (e.g. primary keys and `CardTypes`) are supported, and objects which `orjson` can't serialise
+    natively (e.g. lazy translation strings) fall back to Django's encoder.
     """
 
-    @staticmethod
-    def to_json(func: F) -> F:
-        def wrapper(*args: Any, **kwargs: Any) -> Union[F, HttpResponse]:
+    return orjson.dumps(data, default=json_encoder.default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class OrjsonResponse(HttpResponse):
+    """
+    An HTTP response class which serialises `data` to JSON with `dump_json`.
+    """
+
+    def __init__(self, data: Any, **kwargs: Any) -> None:
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=dump_json(data), **kwargs)
+
+
+def parse_json_body(request: HttpRequest) -> Any:
+    """
+    :raises: orjson.JSONDecodeError (a subclass of ValueError) if the request body is not valid JSON.
+    """
+
+    return orjson.loads(request.body)
+
+
+# JSON schema validators are built once rather than on every request
+
+
+@lru_cache(maxsize=None)
+def get_cards_body_validator(max_card_identifiers: int) -> Draft202012Validator:
+    return Draft202012Validator(
+        {
+            "type": "object",
+            "properties": {
+                "card_identifiers": {"type": "array", "items": {"type": "string"}, "maxItems": max_card_identifiers}
+            },
+            "required": ["card_identifiers"],
+            "additionalProperties": False,
+        }
+    )
+
+
+IMPORT_SITE_DECKLIST_BODY_VALIDATOR = Draft202012Validator(
+    {
+        "type": "object",
+        "properties": {"url": {"type": "string"}},
+        "required": ["url"],
+        "additionalProperties": False,
+    }
+)
+
+
+def validate_json_body(json_body: Any, validator: Draft202012Validator) -> None:
+    """
+    Equivalent to `jsonschema.validate` for a prebuilt validator.
+    :raises: ValidationError describing the most relevant error in `json_body`.
+    """
+
+    if (error := best_match(validator.iter_errors(json_body))) is not None:
+        raise error
+
+
+def api_view(method: str) -> Callable[[F], F]:
+    """
+    View function decorator for the new API. Exempts the view from CSRF checks, rejects requests which don't use
+    `method`, and gracefully handles exceptions so the exception message can be displayed to the user.
+    All of this happens in a single wrapper rather than stacking one decorator per concern.
+    """
+
+    def decorator(func: F) -> F:
+        @wraps(func)
+        def wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
             try:
-                return func(*args, **kwargs)
+                if request.method != method:
+                    raise BadRequestException(f"Expected {method} request.")
+                return func(request, *args, **kwargs)
             except SearchExceptions.ElasticsearchOfflineException:
-                return JsonResponse({"name": "Search engine is offline", "message": None}, status=500)
+                return OrjsonResponse({"name": "Search engine is offline", "message": None}, status=500)
             except BadRequestException as bad_request_exception:
-                return JsonResponse({"name": "Bad request", "message": bad_request_exception.args[0]}, status=400)
+                return OrjsonResponse({"name": "Bad request", "message": bad_request_exception.args[0]}, status=400)
             except Exception as e:
                 sentry_sdk.capture_exception(e)
-                return JsonResponse(
+                return OrjsonResponse(
                     {"name": f"Unhandled {e.__class__.__name__}", "message": str(e.args[0])}, status=500
                 )
 
+        wrapper.csrf_exempt = True  # type: ignore  # equivalent to `csrf_exempt` without another layer of wrapping
         return cast(F, wrapper)
 
+    return decorator
 
-@csrf_exempt
-@NewErrorWrappers.to_json
+
+@api_view(method="POST")
 def post_search_results(request: HttpRequest) -> HttpResponse:
     """
     Return the first page of search results for a given list of queries.
@@ -450,10 +537,7 @@ def post_search_results(request: HttpRequest) -> HttpResponse:
     and it's assumed that `hits` starts from the first hit.
     """
 
-    if request.method != "POST":
-        raise BadRequestException("Expected POST request.")
-
-    json_body = json.loads(request.body)
+    json_body = parse_json_body(request)
 
     try:
         search_settings, queries = parse_json_body_as_search_data(json_body)
@@ -464,168 +548,128 @@ def post_search_results(request: HttpRequest) -> HttpResponse:
         raise SearchExceptions.ElasticsearchOfflineException()
 
     results: dict[str, dict[str, list[str]]] = defaultdict(dict)
-    for query in queries:
-        if results[query.query].get(query.card_type, None) is None:
-            hits = query.retrieve_card_identifiers(search_settings=search_settings)
-            results[query.query][query.card_type] = hits
-    return JsonResponse({"results": results})
+    for query, hits in retrieve_card_identifiers_for_queries(queries, search_settings).items():
+        results[query.query][query.card_type] = hits
+    return OrjsonResponse({"results": results})
 
 
-@csrf_exempt
-@NewErrorWrappers.to_json
+@api_view(method="POST")
 def post_cards(request: HttpRequest) -> HttpResponse:
-    if request.method != "POST":
-        raise BadRequestException("Expected POST request.")
-
-    json_body = json.loads(request.body)
+    json_body = parse_json_body(request)
     try:
-        validate(
-            json_body,
-            schema={
-                "type": "object",
-                "properties": {
-                    "card_identifiers": {"type": "array", "items": {"type": "string"}, "maxItems": CARDS_PAGE_SIZE}
-                },
-                "required": ["card_identifiers"],
-                "additionalProperties": False,
-            },
-        )
+        validate_json_body(json_body, get_cards_body_validator(CARDS_PAGE_SIZE))
     except ValidationError as e:
         raise BadRequestException(f"Malformed JSON body:\n\n{e.message}")
 
-    results = {x.identifier: x.to_dict() for x in Card.objects.filter(identifier__in=json_body["card_identifiers"])}
-    return JsonResponse({"results": results})
+    # `Card.to_dict` reads several fields from each card's source, so join sources in the same query
+    results = {
+        x.identifier: x.to_dict()
+        for x in Card.objects.filter(identifier__in=json_body["card_identifiers"]).select_related("source")
+    }
+    return OrjsonResponse({"results": results})
 
 
-@csrf_exempt
-@NewErrorWrappers.to_json
+@api_view(method="GET")
+@cache_control(public=True, max_age=60, stale_while_revalidate=300)
+@cached_database_response(SOURCES_CACHE_KEY)
 def get_sources(request: HttpRequest) -> HttpResponse:
     """
     Return a list of sources.
     """
 
-    if request.method != "GET":
-        raise BadRequestException("Expected GET request.")
-
     results = {x.pk: x.to_dict() for x in Source.objects.order_by("ordinal", "pk")}
-    return JsonResponse({"results": results})
+    return OrjsonResponse({"results": results})
 
 
-@csrf_exempt
-@NewErrorWrappers.to_json
+@api_view(method="GET")
+@cache_control(public=True, max_age=60, stale_while_revalidate=300)
+@cached_database_response(DFC_PAIRS_CACHE_KEY)
 def get_dfc_pairs(request: HttpRequest) -> HttpResponse:
     """
     Return a list of double-faced cards. The unedited names are returned and the frontend is expected to sanitise them.
     """
 
-    if request.method != "GET":
-        raise BadRequestException("Expected GET request.")
-
-    dfc_pairs = dict((x.front, x.back) for x in DFCPair.objects.all())
-    return JsonResponse({"dfc_pairs": dfc_pairs})
+    # read the two fields as tuples rather than instantiating a model per row
+    dfc_pairs = dict(DFCPair.objects.values_list("front", "back").iterator(chunk_size=2000))
+    return OrjsonResponse({"dfc_pairs": dfc_pairs})
 
 
-@csrf_exempt
-@NewErrorWrappers.to_json
+@api_view(method="GET")
+@cache_control(public=True, max_age=60, stale_while_revalidate=300)
+@cached_database_response(LANGUAGES_CACHE_KEY)
 def get_languages(request: HttpRequest) -> HttpResponse:
     """
     Return the list of all unique languages among cards in the database.
     """
 
-    if request.method != "GET":
-        raise BadRequestException("Expected GET request.")
-    return JsonResponse(
-        {
-            "languages": sorted(
-                [
-                    {"name": language.name, "code": row[0].upper()}
-                    for row in Card.objects.order_by().values_list("language").distinct()
-                    if (language := pycountry.languages.get(alpha_2=row[0])) is not None
-                ],
-                # sort like this so DEFAULT_LANGUAGE is first, then the rest of the languages are in alphabetical order
-                key=lambda row: "-" if row["code"] == DEFAULT_LANGUAGE.alpha_2 else row["name"],
-            )
-        }
-    )
+    codes = {code.upper() for code in Card.objects.order_by().values_list("language", flat=True).distinct()}
+    # sort like this so DEFAULT_LANGUAGE is first, then the rest of the languages are in alphabetical order
+    rows = [
+        ("-" if code == DEFAULT_LANGUAGE.alpha_2 else name, name, code)
+        for code in codes
+        if (name := LANGUAGE_NAMES.get(code)) is not None
+    ]
+    rows.sort(key=itemgetter(0))
+    languages = [{"name": name, "code": code} for _, name, code in rows]
+    return OrjsonResponse({"languages": languages})
 
 
-@csrf_exempt
-@NewErrorWrappers.to_json
+@api_view(method="GET")
+@cache_control(public=True, max_age=60, stale_while_revalidate=300)
+@cached_database_response(TAGS_CACHE_KEY)
 def get_tags(request: HttpRequest) -> HttpResponse:
     """
     Return a list of all tags that cards can be tagged with.
     """
 
-    if request.method != "GET":
-        raise BadRequestException("Expected GET request.")
-    return JsonResponse(
-        {"tags": sorted([tag.to_dict() for tag in Tags().tags.values() if tag.parent is None], key=lambda x: x["name"])}
-    )
+    tags = sorted([tag.to_dict() for tag in Tags().tags.values() if tag.parent is None], key=lambda x: x["name"])
+    return OrjsonResponse({"tags": tags})
 
 
-@csrf_exempt
-@NewErrorWrappers.to_json
+@api_view(method="POST")
 def post_cardbacks(request: HttpRequest) -> HttpResponse:
     """
     Return a list of cardbacks, possibly filtered by the user's search settings.
     """
 
-    if request.method != "POST":
-        raise BadRequestException("Expected POST request.")
-
     try:
-        json_body = json.loads(request.body)
+        json_body = parse_json_body(request)
         search_settings = parse_json_body_as_search_settings(json_body)
     except ValidationError as e:
         raise BadRequestException(f"The provided JSON body is invalid:\n\n{e.message}")
 
     cardbacks = search_settings.retrieve_cardback_identifiers()
-    return JsonResponse({"cardbacks": cardbacks})
+    return OrjsonResponse({"cardbacks": cardbacks})
 
 
-@csrf_exempt
-@NewErrorWrappers.to_json
+@api_view(method="GET")
+@cache_control(public=True, max_age=60, stale_while_revalidate=300)
 def get_import_sites(request: HttpRequest) -> HttpResponse:
     """
     Return a list of import sites.
     """
 
-    if request.method != "GET":
-        raise BadRequestException("Expected GET request.")
-
     game_integration = get_configured_game_integration()
     if game_integration is None:
-        return JsonResponse({"import_sites": []})
+        return OrjsonResponse({"import_sites": []})
 
     import_sites = [{"name": site.__name__, "url": site.get_base_url()} for site in game_integration.get_import_sites()]
-    return JsonResponse({"import_sites": import_sites})
+    return OrjsonResponse({"import_sites": import_sites})
 
 
-@csrf_exempt
-@NewErrorWrappers.to_json
+@api_view(method="POST")
 def post_import_site_decklist(request: HttpRequest) -> HttpResponse:
     """
     Read the specified import site URL and process & return the associated decklist.
     """
 
-    if request.method != "POST":
-        raise BadRequestException("Expected POST request.")
-
     game_integration = get_configured_game_integration()
     if game_integration is None:
         raise BadRequestException("No game integration is configured on this server.")
 
-    json_body = json.loads(request.body)
+    json_body = parse_json_body(request)
     try:
-        validate(
-            json_body,
-            schema={
-                "type": "object",
-                "properties": {"url": {"type": "string"}},
-                "required": ["url"],
-                "additionalProperties": False,
-            },
-        )
+        validate_json_body(json_body, IMPORT_SITE_DECKLIST_BODY_VALIDATOR)
     except ValidationError as e:
         raise BadRequestException(f"Malformed JSON body:\n\n{e.message}")
 
@@ -633,157 +677,116 @@ def post_import_site_decklist(request: HttpRequest) -> HttpResponse:
         decklist = game_integration.query_import_site(json_body.get("url"))
         if decklist is None:
             raise BadRequestException("The specified decklist URL does not match any known import sites.")
-        return JsonResponse({"cards": decklist})
+        return OrjsonResponse({"cards": decklist})
     except ValueError as e:
         raise BadRequestException(str(e))
 
 
-@csrf_exempt
-@NewErrorWrappers.to_json
+@api_view(method="GET")
 def get_sample_cards(request: HttpRequest) -> HttpResponse:
     """
     Return a selection of cards you can query this database for.
     Used in the placeholder text of the Add Cards — Text component in the frontend.
-
-    TODO: i don't know how to do this in a single query in the Django ORM :(
     """
 
-    if request.method != "GET":
-        raise BadRequestException("Expected GET request.")
-
-    # sample some large number of identifiers from the database (while avoiding sampling NSFW cards)
-    identifiers = {
-        card_type: list(
-            Card.objects.filter(~Q(tags__overlap=[NSFW]) & Q(card_type=card_type)).values_list("id", flat=True)[0:5000]
+    # select a few identifiers of each card type at random from some large number of candidates (while avoiding
+    # sampling NSFW cards) - bounding the candidates stops the database from sorting every card of each type.
+    # the per-type samples are combined with UNION ALL so this is a single query
+    sample_querysets = [
+        Card.objects.filter(
+            pk__in=Card.objects.filter(~Q(tags__overlap=[NSFW]) & Q(card_type=card_type)).values("id")[:5000]
         )
+        .order_by("?")
+        .values_list("id", flat=True)[: 4 if card_type == CardTypes.CARD else 1]
         for card_type in CardTypes
-    }
-
-    # select a few of those identifiers at random
-    selected_identifiers = [
-        identifier
-        for card_type in CardTypes
-        for identifier in sample(
-            identifiers[card_type], k=min(4 if card_type == CardTypes.CARD else 1, len(identifiers[card_type]))
-        )
     ]
+    selected_identifiers = list(sample_querysets[0].union(*sample_querysets[1:], all=True))
 
     # retrieve the full ORM objects for the selected identifiers and group by type
-    cards = [card.to_dict() for card in Card.objects.filter(pk__in=selected_identifiers).order_by("card_type")]
-    cards_by_type = {
-        card_type: list(grouped_cards_iterable)
-        for card_type, grouped_cards_iterable in itertools.groupby(cards, key=lambda x: x["card_type"])
-    }
+    cards_by_type: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for card in Card.objects.filter(pk__in=selected_identifiers).select_related("source"):
+        cards_by_type[card.card_type].append(card.to_dict())
 
-    return JsonResponse({"cards": {CardTypes.CARD: [], CardTypes.CARDBACK: [], CardTypes.TOKEN: []} | cards_by_type})
+    return OrjsonResponse({"cards": {CardTypes.CARD: [], CardTypes.CARDBACK: [], CardTypes.TOKEN: []} | cards_by_type})
 
 
-@csrf_exempt
-@NewErrorWrappers.to_json
+@api_view(method="GET")
 def get_contributions(request: HttpRequest) -> HttpResponse:
     """
     Return a summary of contributions to the database.
     Used by the Contributions page.
     """
 
-    if request.method != "GET":
-        raise BadRequestException("Expected GET request.")
-
     sources, card_count_by_type, total_database_size = summarise_contributions()
-    return JsonResponse(
+    return OrjsonResponse(
         {"sources": sources, "card_count_by_type": card_count_by_type, "total_database_size": total_database_size}
     )
 
 
-@csrf_exempt
-@NewErrorWrappers.to_json
+@api_view(method="GET")
 def get_new_cards_first_pages(request: HttpRequest) -> HttpResponse:
-    if request.method != "GET":
-        raise BadRequestException("Expected GET request.")
-
-    response_body: dict[str, dict[str, Any]] = {}
-    for source in Source.objects.all():
-        paginator = get_new_cards_paginator(source=source)
-        if paginator.count > 0:
-            response_body[source.key] = {
-                "source": source.to_dict(),
-                "hits": paginator.count,
-                "pages": paginator.num_pages,
-                "cards": [card.to_dict() for card in paginator.get_page(1).object_list],
-            }
-    return JsonResponse({"results": response_body})
-
-
-@csrf_exempt
-@NewErrorWrappers.to_json
-def get_new_cards_page(request: HttpRequest) -> HttpResponse:
-    if request.method != "GET":
-        raise BadRequestException("Expected GET request.")
+    return OrjsonResponse({"results": retrieve_new_cards_first_pages()})
+
 
+@api_view(method="GET")
+def get_new_cards_page(request: HttpRequest) -> HttpResponse:
     source_key = request.GET.get("source")
     if not source_key:
         raise BadRequestException("Source not specified.")
-    source_q = Source.objects.filter(key=source_key)
-
-    if source_q.count() == 0:
+    try:
+        source = Source.objects.get(key=source_key)
+    except Source.DoesNotExist:
         raise BadRequestException(f"Invalid source key {source_key} specified.")
-    paginator = get_new_cards_paginator(source=source_q[0])
 
     page = request.GET.get("page")
     if page is None:
         raise BadRequestException("Page not specified.")
     try:
         page_int = int(page)
-        if not (paginator.num_pages >= page_int > 0):
-            raise BadRequestException(
-                f"Invalid page {page_int} specified - must be between 1 and {paginator.num_pages} "
-                f"for source {source_key}."
-            )
-        return JsonResponse({"cards": [card.to_dict() for card in paginator.page(page).object_list]})
     except ValueError:
         raise BadRequestException("Invalid page specified.")
 
+    # only count the source's new cards (through `num_pages`) once the request is known to be well-formed
+    paginator = get_new_cards_paginator(source=source)
+    if not (paginator.num_pages >= page_int > 0):
+        raise BadRequestException(
+            f"Invalid page {page_int} specified - must be between 1 and {paginator.num_pages} for source {source_key}."
+        )
+    return OrjsonResponse({"cards": [card.to_dict() for card in paginator.page(page_int).object_list]})
+
 
-@csrf_exempt
-@NewErrorWrappers.to_json
+@api_view(method="GET")
 def get_info(request: HttpRequest) -> HttpResponse:
     """
     Return a stack of metadata about the server for the frontend to display.
     It's expected that this route will be called once when the server is connected.
     """
 
-    if request.method != "GET":
-        raise BadRequestException("Expected GET request.")
-
-    campaign, tiers = get_patreon_campaign_details()
-    members = get_patrons(campaign["id"], tiers) if campaign is not None and tiers is not None else None
-
-    return JsonResponse(
-        {
-            "info": {
-                "name": settings.SITE_NAME,
-                "description": settings.DESCRIPTION,
-                "email": settings.TARGET_EMAIL,
-                "reddit": settings.REDDIT,
-                "discord": settings.DISCORD,
-                "patreon": {
-                    "url": settings.PATREON_URL,
-                    "members": members,
-                    "tiers": tiers,
-                    "campaign": campaign,
-                },
-            }
+    def get_info_dict() -> dict[str, Any]:
+        campaign, tiers = get_patreon_campaign_details()
+        members = get_patrons(campaign["id"], tiers) if campaign is not None and tiers is not None else None
+        return {
+            "name": settings.SITE_NAME,
+            "description": settings.DESCRIPTION,
+            "email": settings.TARGET_EMAIL,
+            "reddit": settings.REDDIT,
+            "discord": settings.DISCORD,
+            "patreon": {
+                "url": settings.PATREON_URL,
+                "members": members,
+                "tiers": tiers,
+                "campaign": campaign,
+            },
         }
-    )
 
+    # the Patreon API is slow to respond, so only query it periodically
+    info = cache.get_or_set(INFO_CACHE_KEY, get_info_dict, timeout=PATREON_CACHE_TIMEOUT)
+    return OrjsonResponse({"info": info})
 
-@csrf_exempt
-@NewErrorWrappers.to_json
-def get_search_engine_health(request: HttpRequest) -> HttpResponse:
-    if request.method != "GET":
-        raise BadRequestException("Expected GET request.")
 
-    return JsonResponse({"online": ping_elasticsearch()})
+@api_view(method="GET")
+def get_search_engine_health(request: HttpRequest) -> HttpResponse:
+    return OrjsonResponse({"online": ping_elasticsearch(force=True)})
 
 
 # endregion
@@ -1,6 +1,9 @@
 import base64
 import os
+import stat
 import sys
+import threading
+import unicodedata
 from typing import Any, Optional
 
 import ratelimit
@@ -11,13 +14,17 @@ from src.processing import ImagePostProcessingConfig, post_process_image
 
 # region network IO
 
+# a shared session reuses connections to the Google Scripts APIs across requests and download threads,
+# rather than performing a new TCP + TLS handshake for each request
+session = requests.Session()
+
 
 @ratelimit.sleep_and_retry  # type: ignore  # `ratelimit` does not implement decorator typing correctly
 @ratelimit.limits(calls=1, period=0.1)  # type: ignore  # `ratelimit` does not implement decorator typing correctly
 def rate_limit_api_call(
     url: str, method: str, data: dict[str, Any], params: dict[str, Any], timeout: Optional[int] = None
 ) -> requests.Response:
-    with requests.request(url=url, method=method, data=data, params=params, timeout=timeout) as r_info:
+    with session.request(url=url, method=method, data=data, params=params, timeout=timeout) as r_info:
         return r_info
 
 
@@ -71,17 +78,28 @@ def safe_post_api_call(
             return None
 
 
+# Google Drive file names retrieved so far in this run, keyed by file ID
+google_drive_file_names: dict[str, str] = {}
+
+
 def get_google_drive_file_name(drive_id: str) -> Optional[str]:
     """
     Retrieve the name for the Google Drive file identified by `drive_id`.
+    Names are remembered for the rest of the run because the same image often appears in an order many times
+    (e.g. the common cardback). Failed lookups aren't remembered so they're retried next time.
     """
 
     if not drive_id:
         return None
+    if (name := google_drive_file_names.get(drive_id)) is not None:
+        return name
     response = safe_post_api_call(
         url=constants.GoogleScriptsAPIs.image_name, data={"id": drive_id}, timeout=30, expected_keys={"name"}
     )
-    return response["name"] if response is not None else None
+    if response is None:
+        return None
+    google_drive_file_names[drive_id] = response["name"]
+    return response["name"]
 
 
 # endregion
@@ -99,8 +117,68 @@ def image_directory() -> str:
     return cards_folder
 
 
+# normalised names of the entries in each directory listed so far, keyed by the directory's normalised absolute path
+directory_listings: dict[str, set[str]] = {}
+directory_listings_lock = threading.Lock()
+
+
+def normalise_path(path: str) -> str:
+    """
+    Normalise `path` for looking up cached directory listings. Case and unicode normalisation are ignored on every
+    platform since some filesystems (e.g. the macOS default) ignore them - a false match only costs a `stat`.
+    """
+
+    return unicodedata.normalize("NFC", os.path.normcase(path)).casefold()
+
+
+def split_file_path(file_path: str) -> tuple[str, str]:
+    directory, name = os.path.split(os.path.abspath(file_path))
+    return normalise_path(directory), normalise_path(name)
+
+
 def file_exists(file_path: Optional[str]) -> bool:
-    return file_path is not None and file_path != "" and os.path.isfile(file_path) and os.path.getsize(file_path) > 0
+    if file_path is None or file_path == "":
+        return False
+    try:
+        file_stat = os.stat(file_path)  # one `stat` rather than one each for `isfile` and `getsize`
+    except (OSError, ValueError):
+        return False
+    return stat.S_ISREG(file_stat.st_mode) and file_stat.st_size > 0
+
+
+def listed_file_exists(file_path: Optional[str]) -> bool:
+    """
+    Equivalent to `file_exists`, but checks a cached listing of the file's directory first. Building an order checks
+    many paths which don't exist (e.g. Google Drive IDs), and this avoids a `stat` for each of them.
+    Only intended for use while building an order - check downloaded files with `file_exists`.
+    """
+
+    if file_path is None or file_path == "":
+        return False
+    directory, name = split_file_path(file_path)
+    with directory_listings_lock:
+        # list the directory while holding the lock so files recorded by `record_new_file` can't be missed
+        if (listing := directory_listings.get(directory)) is None:
+            try:
+                listing = {normalise_path(entry) for entry in os.listdir(directory)}
+            except OSError:
+                listing = set()
+            directory_listings[directory] = listing
+        if name not in listing:
+            return False
+    return file_exists(file_path)
+
+
+def record_new_file(file_path: str) -> None:
+    """
+    Keep the cached directory listings used by `listed_file_exists` up to date after writing a file.
+    Removed files don't need to be recorded since `listed_file_exists` confirms every listed file with a `stat`.
+    """
+
+    directory, name = split_file_path(file_path)
+    with directory_listings_lock:
+        if (listing := directory_listings.get(directory)) is not None:
+            listing.add(name)
 
 
 def remove_directories(directory_list: list[str]) -> None:
@@ -135,13 +213,18 @@ def download_google_drive_file(
     response = safe_get_api_call(url=constants.GoogleScriptsAPIs.image_content, params={"id": drive_id}, timeout=5 * 60)
     if response is not None and len(response) > 0:
         file_bytes = base64.b64decode(response)
-        if post_processing_config is not None:
-            processed_image = post_process_image(raw_image=file_bytes, config=post_processing_config)
+        processed_image = (
+            post_process_image(raw_image=file_bytes, config=post_processing_config)
+            if post_processing_config is not None
+            else None
+        )
+        if processed_image is not None:
             processed_image.save(file_path)
         else:
-            # Save the bytes directly to disk - avoid reading in pillow in case any quality degradation occurs
+            # Save the bytes directly to disk - avoid re-encoding in pillow in case any quality degradation occurs
             with open(file_path, "wb") as f:
                 f.write(file_bytes)
+        record_new_file(file_path)
         return True
     return False
 
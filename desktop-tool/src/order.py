@@ -3,13 +3,13 @@ import sys
 from concurrent.futures import ThreadPoolExecutor
 from glob import glob
 from queue import Queue
-from typing import Optional
+from typing import Any, Optional
 from xml.etree.ElementTree import Element, ParseError
 
 import attr
 import enlighten
 import InquirerPy
-from defusedxml.ElementTree import parse as defused_parse
+from defusedxml.ElementTree import iterparse as defused_iterparse
 from sanitize_filename import sanitize
 
 from src import constants
@@ -20,15 +20,21 @@ from src.io import (
     file_exists,
     get_google_drive_file_name,
     image_directory,
+    listed_file_exists,
 )
 from src.processing import ImagePostProcessingConfig
 from src.utils import bold, text_to_list, unpack_element
 
+# the tags expected in each type of element, computed once rather than for every element unpacked
+BASE_TAGS = tuple(x.value for x in constants.BaseTags)
+DETAILS_TAGS = tuple(x.value for x in constants.DetailsTags)
+CARD_TAGS = tuple(x.value for x in constants.CardTags)
 
-@attr.s
+
+@attr.s(slots=True)
 class CardImage:
     drive_id: str = attr.ib(default="")
-    slots: list[int] = attr.ib(default=[])
+    slots: list[int] = attr.ib(default=attr.Factory(list))
     name: Optional[str] = attr.ib(default="")
     file_path: Optional[str] = attr.ib(default="")
     query: Optional[str] = attr.ib(default=None)
@@ -62,7 +68,7 @@ class CardImage:
         * Otherwise, use `self.name` with `self.drive_id` in parentheses in the `cards` directory as the file path.
         """
 
-        if file_exists(self.drive_id):
+        if listed_file_exists(self.drive_id):
             self.file_path = self.drive_id
             self.name = os.path.basename(self.file_path)
             return
@@ -84,7 +90,7 @@ class CardImage:
                 self.file_path = None
         else:
             file_path = os.path.join(image_directory(), sanitize(self.name))
-            if not os.path.isfile(file_path) or os.path.getsize(file_path) <= 0:
+            if not listed_file_exists(file_path):
                 # The filepath without ID in parentheses doesn't exist - change the filepath to contain the ID instead
                 name_split = self.name.rsplit(".", 1)
                 file_path = os.path.join(
@@ -107,23 +113,26 @@ class CardImage:
 
     # region public
 
-    @classmethod
-    def from_element(cls, element: Element) -> "CardImage":
-        card_dict = unpack_element(element, [x.value for x in constants.DetailsTags])
+    @staticmethod
+    def read_element(element: Element) -> dict[str, Any]:
+        """
+        Read the attributes of a card from its XML element, without constructing the card.
+        """
+
+        card_dict = unpack_element(element, CARD_TAGS)
         drive_id = ""
         if (drive_id_text := card_dict[constants.CardTags.id].text) is not None:
             drive_id = drive_id_text.strip(' "')
         slots = []
         if (slots_text := card_dict[constants.CardTags.slots].text) is not None:
             slots = text_to_list(slots_text)
-        name = None
-        if constants.CardTags.name in card_dict.keys():
-            name = card_dict[constants.CardTags.name].text
-        query = None
-        if constants.CardTags.query in card_dict.keys():
-            query = card_dict[constants.CardTags.query].text
-        card_image = cls(drive_id=drive_id, slots=slots, name=name, query=query)
-        return card_image
+        name = card_dict[constants.CardTags.name].text
+        query = card_dict[constants.CardTags.query].text
+        return {"drive_id": drive_id, "slots": slots, "name": name, "query": query}
+
+    @classmethod
+    def from_element(cls, element: Element) -> "CardImage":
+        return cls(**cls.read_element(element))
 
     def download_image(
         self,
@@ -132,12 +141,14 @@ class CardImage:
         post_processing_config: Optional[ImagePostProcessingConfig],
     ) -> None:
         try:
-            if not self.file_exists() and not self.errored and self.file_path is not None:
+            image_exists = self.file_exists()
+            if not image_exists and not self.errored and self.file_path is not None:
                 self.errored = not download_google_drive_file(
                     drive_id=self.drive_id, file_path=self.file_path, post_processing_config=post_processing_config
                 )
+                image_exists = not self.errored and self.file_exists()
 
-            if self.file_exists() and not self.errored:
+            if image_exists and not self.errored:
                 self.downloaded = True
             else:
                 print(
@@ -158,33 +169,46 @@ class CardImage:
     # endregion
 
 
-@attr.s
+@attr.s(slots=True)
 class CardImageCollection:
     """
     A collection of CardImages for one face of a CardOrder.
     """
 
-    cards: list[CardImage] = attr.ib(default=[])
+    cards: list[CardImage] = attr.ib(default=attr.Factory(list))
     queue: Queue[CardImage] = attr.ib(init=False, default=attr.Factory(Queue))
     num_slots: int = attr.ib(default=0)
     face: constants.Faces = attr.ib(default=constants.Faces.front)
 
     # region initialisation
 
-    def all_slots(self) -> set[int]:
-        return set(range(0, self.num_slots))
-
     def slots(self) -> set[int]:
         return {y for x in self.cards for y in x.slots}
 
+    def missing_slots(self) -> list[int]:
+        """
+        The sorted slots in this collection which have no image. Filled slots are tracked as bits in an integer
+        rather than as a set, which is much cheaper for large orders.
+        """
+
+        filled_mask = 0
+        for card in self.cards:
+            for slot in card.slots:
+                if 0 <= slot < self.num_slots:
+                    filled_mask |= 1 << slot
+        missing_mask = ((1 << self.num_slots) - 1) & ~filled_mask
+        if not missing_mask:
+            return []
+        return [slot for slot in range(self.num_slots) if missing_mask >> slot & 1]
+
     def validate(self) -> None:
         if self.num_slots == 0 or not self.cards:
             raise ValidationException(f"{self.face} has no images!")
-        slots_missing = self.all_slots() - self.slots()
+        slots_missing = self.missing_slots()
         if slots_missing:
             print(
                 f"Warning - the following slots are empty in your order for the {self.face} face: "
-                f"{bold(sorted(slots_missing))}"
+                f"{bold(slots_missing)}"
             )
 
     # endregion
@@ -199,14 +223,18 @@ class CardImageCollection:
         if element:
             for x in element:
                 card_images.append(CardImage.from_element(x))
+        return cls.from_card_images(card_images, num_slots=num_slots, face=face, fill_image_id=fill_image_id)
+
+    @classmethod
+    def from_card_images(
+        cls, card_images: list[CardImage], num_slots: int, face: constants.Faces, fill_image_id: Optional[str] = None
+    ) -> "CardImageCollection":
         card_image_collection = cls(cards=card_images, num_slots=num_slots, face=face)
         if fill_image_id:
             # fill the remaining slots in this card image collection with a new card image based off the given id
-            missing_slots = card_image_collection.all_slots() - card_image_collection.slots()
+            missing_slots = card_image_collection.missing_slots()
             if missing_slots:
-                card_image_collection.cards.append(
-                    CardImage(drive_id=fill_image_id.strip(' "'), slots=list(missing_slots))
-                )
+                card_image_collection.cards.append(CardImage(drive_id=fill_image_id.strip(' "'), slots=missing_slots))
 
         # postponing validation from post-init so we don't error for missing slots that `fill_image_id` would fill
         try:
@@ -232,7 +260,7 @@ class CardImageCollection:
     # endregion
 
 
-@attr.s
+@attr.s(slots=True)
 class Details:
     quantity: int = attr.ib(default=0)
     bracket: int = attr.ib(default=0)
@@ -266,7 +294,7 @@ class Details:
 
     @classmethod
     def from_element(cls, element: Element) -> "Details":
-        details_dict = unpack_element(element, [x.value for x in constants.DetailsTags])
+        details_dict = unpack_element(element, DETAILS_TAGS)
         quantity = 0
         if (quantity_text := details_dict[constants.DetailsTags.quantity].text) is not None:
             quantity = int(quantity_text)
@@ -282,7 +310,7 @@ class Details:
     # endregion
 
 
-@attr.s
+@attr.s(slots=True)
 class CardOrder:
     name: Optional[str] = attr.ib(default=None)
     details: Details = attr.ib(default=None)
@@ -322,41 +350,82 @@ class CardOrder:
 
     @classmethod
     def from_element(cls, element: Element, name: Optional[str] = None) -> "CardOrder":
-        root_dict = unpack_element(element, [x.value for x in constants.BaseTags])
-        details = Details.from_element(root_dict[constants.BaseTags.details])
-        fronts = CardImageCollection.from_element(
-            element=root_dict[constants.BaseTags.fronts], num_slots=details.quantity, face=constants.Faces.front
+        root_dict = unpack_element(element, BASE_TAGS)
+        card_images: dict[str, list[CardImage]] = {constants.BaseTags.fronts: [], constants.BaseTags.backs: []}
+        for face_tag, face_card_images in card_images.items():
+            if root_dict[face_tag]:
+                face_card_images.extend(CardImage.from_element(x) for x in root_dict[face_tag])
+        return cls.from_card_images(
+            details_element=root_dict[constants.BaseTags.details],
+            fronts=card_images[constants.BaseTags.fronts],
+            backs=card_images[constants.BaseTags.backs],
+            cardback_element=root_dict[constants.BaseTags.cardback],
+            name=name,
+        )
+
+    @classmethod
+    def from_card_images(
+        cls,
+        details_element: Element,
+        fronts: list[CardImage],
+        backs: list[CardImage],
+        cardback_element: Element,
+        name: Optional[str] = None,
+    ) -> "CardOrder":
+        details = Details.from_element(details_element)
+        front_collection = CardImageCollection.from_card_images(
+            fronts, num_slots=details.quantity, face=constants.Faces.front
         )
-        cardback_elem = root_dict[constants.BaseTags.cardback]
-        if cardback_elem.text is not None:
-            backs = CardImageCollection.from_element(
-                element=root_dict[constants.BaseTags.backs],
-                num_slots=details.quantity,
-                face=constants.Faces.back,
-                fill_image_id=cardback_elem.text,
+        if cardback_element.text is not None:
+            back_collection = CardImageCollection.from_card_images(
+                backs, num_slots=details.quantity, face=constants.Faces.back, fill_image_id=cardback_element.text
             )
         else:
             print(f"{bold('Warning')}: Your order file did not contain a common cardback image.")
-            backs = CardImageCollection.from_element(
-                element=root_dict[constants.BaseTags.backs], num_slots=details.quantity, face=constants.Faces.back
+            back_collection = CardImageCollection.from_card_images(
+                backs, num_slots=details.quantity, face=constants.Faces.back
             )
         # If the order has a single cardback, set its slots to [0], as it will only be uploaded and inserted into
         # a single slot
-        if len(backs.cards) == 1:
-            backs.cards[0].slots = [0]
-        order = cls(name=name, details=details, fronts=fronts, backs=backs)
+        if len(back_collection.cards) == 1:
+            back_collection.cards[0].slots = [0]
+        order = cls(name=name, details=details, fronts=front_collection, backs=back_collection)
         return order
 
     @classmethod
     def from_file_name(cls, file_name: str) -> "CardOrder":
+        """
+        Streams the XML file rather than parsing it into a full tree first. Each card's attributes are read as soon
+        as its element has been parsed, then the element is cleared so memory use doesn't grow with the order's size.
+        The cards are only constructed (which may look up file names over the network) once the whole file has been
+        read, so syntax errors are reported immediately.
+        """
+
+        print(f"Parsing XML file {bold(file_name)}...")
+        card_attributes: dict[str, list[dict[str, Any]]] = {constants.BaseTags.fronts: [], constants.BaseTags.backs: []}
+        root_children: dict[str, Element] = {}
+        path: list[str] = []  # tags of the elements enclosing the current element
         try:
-            xml = defused_parse(file_name)
+            for event, element in defused_iterparse(file_name, events=("start", "end")):
+                if event == "start":
+                    path.append(element.tag)
+                    continue
+                path.pop()
+                if len(path) == 2 and path[1] in card_attributes:  # a card in <fronts> or <backs>
+                    card_attributes[path[1]].append(CardImage.read_element(element))
+                    element.clear()
+                elif len(path) == 1:  # e.g. <details> or <cardback>
+                    root_children[element.tag] = element
         except ParseError:
             input("Your XML file contains a syntax error so it can't be processed. Press Enter to exit.")
             sys.exit(0)
-        print(f"Parsing XML file {bold(file_name)}...")
-        order = cls.from_element(xml.getroot(), name=file_name)
-        return order
+        return cls.from_card_images(
+            details_element=root_children.get(constants.BaseTags.details, Element(constants.BaseTags.details)),
+            fronts=[CardImage(**x) for x in card_attributes[constants.BaseTags.fronts]],
+            backs=[CardImage(**x) for x in card_attributes[constants.BaseTags.backs]],
+            cardback_element=root_children.get(constants.BaseTags.cardback, Element(constants.BaseTags.cardback)),
+            name=file_name,
+        )
 
     # endregion
 
@@ -1,5 +1,6 @@
 import io
 from dataclasses import dataclass
+from typing import Optional
 
 from PIL import Image
 
@@ -13,14 +14,18 @@ class ImagePostProcessingConfig:
     # jpeg: bool
 
 
-def post_process_image(raw_image: bytes, config: ImagePostProcessingConfig) -> Image:
-    img = Image.open(io.BytesIO(raw_image))
+def post_process_image(raw_image: bytes, config: ImagePostProcessingConfig) -> Optional[Image.Image]:
+    """
+    Returns the post-processed image, or None if `raw_image` doesn't need to be modified according to `config`.
+    In that case the raw bytes should be used as-is, rather than decoding and re-encoding the image for no benefit.
+    """
+
+    img = Image.open(io.BytesIO(raw_image))  # lazy - only the image's header is read here
 
     # downscale the image to `max_dpi`
     img_dpi = 10 * round(int(img.height) * DPI_HEIGHT_RATIO / 10)
-    if img_dpi > config.max_dpi:
-        new_height = round((config.max_dpi / img_dpi) * img.height)
-        new_width = round((config.max_dpi / img_dpi) * img.width)
-        img = img.resize((new_width, new_height), config.downscale_alg.value)
-
-    return img
+    if img_dpi <= config.max_dpi:
+        return None
+    new_height = round((config.max_dpi / img_dpi) * img.height)
+    new_width = round((config.max_dpi / img_dpi) * img.width)
+    return img.resize((new_width, new_height), config.downscale_alg.value)
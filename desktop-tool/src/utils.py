@@ -1,7 +1,7 @@
 import sys
 import time
 from math import floor
-from typing import TYPE_CHECKING, Any, Callable, Optional, TypeVar, cast
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional, TypeVar, cast
 from xml.etree import ElementTree
 from xml.etree.ElementTree import Element
 
@@ -37,13 +37,17 @@ def text_to_list(input_text: str) -> list[int]:
     return sorted([int(x) for x in input_text.strip("][").replace(" ", "").split(",")])
 
 
-def unpack_element(element: ElementTree.Element, tags: list[str]) -> dict[str, ElementTree.Element]:
+def unpack_element(element: ElementTree.Element, tags: Iterable[str]) -> dict[str, ElementTree.Element]:
     """
     Unpacks `element` according to expected tags. Expected tags that don't have elements in `element` have
-    value None in the return dictionary.
+    an empty element (whose text is None) in the return dictionary.
     """
 
-    return {tag: Element(tag) for tag in tags} | {item.tag: item for item in element}
+    unpacked = {item.tag: item for item in element}
+    for tag in tags:
+        if tag not in unpacked:
+            unpacked[tag] = Element(tag)
+    return unpacked
 
 
 def alert_handler(func: F) -> F:
@@ -544,7 +544,8 @@ def test_download_google_drive_image_default_post_processing(
     )
     assert image_valid_google_drive.file_exists() is True
     assert image_valid_google_drive.errored is False
-    assert_file_size(image_valid_google_drive.file_path, 152990)
+    # the image is already below the default maximum DPI, so it's saved without being re-encoded
+    assert_file_size(image_valid_google_drive.file_path, 155686)
 
 
 def test_download_google_drive_image_downscaled(
@@ -613,6 +614,17 @@ def test_card_image_collection_download(card_image_collection_valid, counter, im
     assert all([x.file_exists() for x in card_image_collection_valid.cards])
 
 
+def test_card_image_collection_missing_slots():
+    card_image_collection = CardImageCollection(
+        cards=[
+            CardImage(drive_id=SIMPLE_CUBE_ID, slots=[0, 2], name=f"{SIMPLE_CUBE}.png"),
+            CardImage(drive_id=SIMPLE_LOTUS_ID, slots=[5, 7], name=f"{SIMPLE_LOTUS}.png"),
+        ],
+        num_slots=6,
+    )
+    assert card_image_collection.missing_slots() == [1, 3, 4]
+
+
 def test_card_image_collection_no_cards(input_enter, card_image_collection_element_no_cards):
     with pytest.raises(SystemExit) as exc_info:
         CardImageCollection.from_element(
@@ -21,6 +21,9 @@ done
 npm install && npm run build
 python3 manage.py collectstatic --noinput
 
+# Create the table backing Django's cache before anything writes to it (no-op if it already exists)
+python3 manage.py createcachetable
+
 # Check if we are running for the first time
 if ! python3 manage.py migrate --check; then
     # Run migrations and populate database